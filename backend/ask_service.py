@@ -1,4 +1,13 @@
+import asyncio
+import io
 import os
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from functools import partial
+from itertools import groupby
+from typing import Any
 
 from dotenv import load_dotenv
 from groq import Groq
@@ -12,11 +21,11 @@ Interview awareness:
 - "Tell me about yourself" / "Introduce Mayar" → Short summary: who he is (role, background), key experience, and what he focuses on (e.g. full-stack, AI, front-end). Mention education and current work.
 - "Strengths" / "Why hire him" → Draw from his skills, projects, and experience: e.g. full-stack + AI, real products shipped, technologies, collaboration.
 - "Experience" / "Background" → Use his roles, companies, dates, and descriptions. Include impact and technologies where available.
-- "Projects" / "What has he built" → Name projects with URLs, short description, and tech or role. Always include the full URL for each project.
+- "Projects" / "What has he built" → Name projects with URLs, short description, and tech or role.
 - "Challenging project" / "Biggest achievement" / "Describe a time when" → Pick the most relevant project or role from context and frame it with problem, what he did, and outcome.
-- "Skills" / "Tech stack" / "Technologies" → Use the skills section; group by area (front-end, backend, AI, etc.) and use commas, not one per line.
+- "Skills" / "Tech stack" / "Technologies" → Use the skills section, grouped by area (front-end, backend, AI, etc.).
 - "Education" / "Degree" / "Where did he study" → Use education from context (degree, institution, graduation year, boot camp).
-- "Contact" / "How to reach" / "Email" / "LinkedIn" → Give the exact link or email from context; include full URLs.
+- "Contact" / "How to reach" / "Email" / "LinkedIn" → Give the exact email or link from context.
 - If the user refers to something from the previous message (e.g. "that project", "there", "his role at X"), use the recent conversation to understand what they mean and answer accordingly.
 - If something is not in the context, say so briefly and offer what you can answer from his CV.
 
@@ -25,182 +34,447 @@ Format (Markdown):
 - Use ## for main sections and ### for sub-sections when listing several items.
 - Use bullet points (- or *) for key points; keep each project/role in its own block with a heading, then bullets.
 - Keep answers scannable: short lines and bullets, not long paragraphs.
-- Skills/technologies: comma-separated only, e.g. **Frontend:** React, Next.js, TypeScript. Never one skill per line.
+- Skills/technologies: comma-separated, one line per area. Never one skill per line. Example:
+**Area:** Skill A, Skill B, Skill C
+**Another area:** Skill D, Skill E
 
 Links: Whenever you mention something that has a URL in the context (projects, GitHub, LinkedIn), always include the full URL (e.g. https://...) in your answer so the user can click it."""
 
 
+# Profile lines as (label, key); keys are looked up in the profile and its contact and
+# links dicts. Empty fields are left out rather than sent as bare labels.
+_PROFILE_FIELDS = (
+    ("Name", "name"),
+    ("Job title", "jobTitle"),
+    ("Email", "email"),
+    ("Phone", "phone"),
+    ("GitHub", "github"),
+    ("LinkedIn", "linkedin"),
+)
+
+# Section templates for _render_context; missing fields render as "".
+_EXPERIENCE_TEMPLATE = "- {role} at {company} ({dates})\n  {description}"
+_PROJECT_TEMPLATE = "- {name}{url}\n  {description}"
+
+# The last (data, rendered context) pair. load_data() returns the same dict until
+# db_store.json changes, so an identity check is enough to reuse the rendering.
+_CTX_CACHE: tuple[dict, str] | None = None
+
+
 def build_context(data: dict) -> str:
-    """Build a single text block from db_store for the LLM context."""
-    parts = []
+    """Build a single text block from db_store for the LLM context (memoized on data identity)."""
+    global _CTX_CACHE
+    cached = _CTX_CACHE
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    context = _render_context(data)
+    _CTX_CACHE = (data, context)
+    return context
+
+
+def _render_profile(profile: dict) -> str:
+    contact = profile.get("contact") or {}
+    links = profile.get("links") or {}
+    fields = {**links, **contact, **profile}
+    lines = [f"{label}: {fields[key]}" for label, key in _PROFILE_FIELDS if fields.get(key)]
+    return "\n".join(["## Profile", *lines])
+
+
+def _render_experience(experience: list) -> str:
+    buf = io.StringIO()
+    write = buf.write
+    write("## Experience")
+    for job in experience:
+        write("\n")
+        write(_EXPERIENCE_TEMPLATE.format_map(defaultdict(str, {"company": "N/A", **job})))
+    return buf.getvalue()
 
-    profile = data.get("profile") or {}
-    if profile:
-        parts.append("## Profile")
-        parts.append(f"Name: {profile.get('name', '')}")
-        parts.append(f"Job title: {profile.get('jobTitle', '')}")
-        contact = profile.get("contact") or {}
-        if contact:
-            parts.append(f"Email: {contact.get('email', '')}")
-            parts.append(f"Phone: {contact.get('phone', '')}")
-        links = profile.get("links") or {}
-        if links:
-            parts.append(f"GitHub: {links.get('github', '')}")
-            parts.append(f"LinkedIn: {links.get('linkedin', '')}")
-        parts.append("")
-
-    experience = data.get("experience") or []
-    if experience:
-        parts.append("## Experience")
-        for job in experience:
-            parts.append(f"- {job.get('role', '')} at {job.get('company', 'N/A')} ({job.get('dates', '')})")
-            parts.append(f"  {job.get('description', '')}")
-        parts.append("")
-
-    projects = data.get("projects") or []
-    if projects:
-        parts.append("## Projects")
-        for p in projects:
-            parts.append(f"- {p.get('name', '')} ({p.get('url', '')})")
-            parts.append(f"  {p.get('description', '')}")
-        parts.append("")
-    open_source = data.get("openSource") or []
-    if open_source:
-        parts.append("## Open Source Contributions")
-        for c in open_source:
-            name = c.get("name", "")
-            url = c.get("url", "")
-            date = c.get("date", "")
-            language = c.get("language", "")
-            desc = c.get("description", "")
-
-            header = f"- {name}"
-            if date:
-                header += f" ({date})"
-            if url:
-                header += f" - {url}"
-
-            parts.append(header)
-
-            meta = []
-            if language:
-                meta.append(f"Language: {language}")
-
-            if meta:
-                parts.append("  " + ", ".join(meta))
-
-            if desc:
-                parts.append(f"  {desc}")
-
-        parts.append("")
-    education = data.get("education") or []
-    if education:
-        parts.append("## Education")
-        for e in education:
-            line = e.get("degree") or e.get("program") or ""
-            if e.get("institution"):
-                line += f" - {e['institution']}"
-            if e.get("graduationYear") or e.get("dates"):
-                line += f" ({e.get('graduationYear') or e.get('dates')})"
-            parts.append(f"- {line}")
-            if e.get("description"):
-                parts.append(f"  {e['description']}")
-        parts.append("")
-
-    skills = data.get("skills") or {}
-    if skills and isinstance(skills, dict):
-        parts.append("## Skills")
-        for key, value in skills.items():
-            if key == "notes" or not value:
-                continue
-            if isinstance(value, list):
-                parts.append(f"{key}: {', '.join(str(v) for v in value)}")
-            else:
-                parts.append(f"{key}: {value}")
-        if skills.get("notes"):
-            parts.append(f"Notes: {skills['notes']}")
 
-    return "\n".join(parts).strip()
+def _render_projects(projects: list) -> str:
+    buf = io.StringIO()
+    write = buf.write
+    write("## Projects")
+    for p in projects:
+        write("\n")
+        write(_PROJECT_TEMPLATE.format_map(defaultdict(str, p, url=f" ({p['url']})" if p.get("url") else "")))
+    return buf.getvalue()
+
+
+def _render_open_source(open_source: list) -> str:
+    buf = io.StringIO()
+    write = buf.write
+    write("## Open Source Contributions")
+    for c in open_source:
+        name = c.get("name", "")
+        url = c.get("url", "")
+        date = c.get("date", "")
+        language = c.get("language", "")
+        desc = c.get("description", "")
+
+        write(f"\n- {name}")
+        if date:
+            write(f" ({date})")
+        if url:
+            write(f" - {url}")
+
+        if language:
+            write(f"\n  Language: {language}")
+
+        if desc:
+            write(f"\n  {desc}")
+    return buf.getvalue()
+
+
+def _render_education(education: list) -> str:
+    buf = io.StringIO()
+    write = buf.write
+    write("## Education")
+    for e in education:
+        write(f"\n- {e.get('degree') or e.get('program') or ''}")
+        if e.get("institution"):
+            write(f" - {e['institution']}")
+        if e.get("graduationYear") or e.get("dates"):
+            write(f" ({e.get('graduationYear') or e.get('dates')})")
+        if e.get("description"):
+            write(f"\n  {e['description']}")
+    return buf.getvalue()
+
+
+def _render_skills(skills: dict) -> str:
+    if not isinstance(skills, dict):
+        return ""
+    buf = io.StringIO()
+    write = buf.write
+    write("## Skills")
+    for key, value in skills.items():
+        if key == "notes" or not value:
+            continue
+        if isinstance(value, list):
+            write(f"\n{key}: {', '.join(str(v) for v in value)}")
+        else:
+            write(f"\n{key}: {value}")
+    if skills.get("notes"):
+        write(f"\nNotes: {skills['notes']}")
+    return buf.getvalue()
+
+
+# Context sections in output order: (db_store key, renderer). Each renderer gets the
+# section's (non-empty) value and returns its Markdown block, or "" to skip it.
+_SECTION_RENDERERS: list[tuple[str, Callable[[Any], str]]] = [
+    ("profile", _render_profile),
+    ("experience", _render_experience),
+    ("projects", _render_projects),
+    ("openSource", _render_open_source),
+    ("education", _render_education),
+    ("skills", _render_skills),
+]
+
+
+def _render_context(data: dict) -> str:
+    """Render the CV data as Markdown sections (uncached)."""
+    sections = (render(value) for key, render in _SECTION_RENDERERS if (value := data.get(key)))
+    return "\n\n".join(section for section in sections if section).strip()
+
+
+# Limits for _collapse_skill_lines, on stripped line length: a header is shorter than
+# _HEADER_MAX, a run starts on a line shorter than _ITEM_MAX and continues on lines of
+# at most _ITEM_MAX; only runs of _MIN_RUN or more lines are merged.
+_BULLET_PREFIXES = ("-", "*", "#")
+_HEADER_MAX = 45
+_ITEM_MAX = 55
+_MIN_RUN = 3
+
+# Per-line classifiers for _collapse_skill_lines, matched against stripped lines.
+# _BULLET_CHARS is the escaped body of a [...] character class, not a full pattern.
+_BULLET_CHARS = re.escape("".join(_BULLET_PREFIXES))
+# A section header has a space and isn't a bullet/heading ("Technical Skills").
+_HEADER_RE = re.compile(rf"[^{_BULLET_CHARS}][^ ]* .*")
+# A list item candidate is non-empty, has no comma and isn't a bullet/heading.
+_ITEM_RE = re.compile(rf"[^{_BULLET_CHARS},][^,]*")
+# _MIN_RUN consecutive lines that could be list items (ignoring length limits). Most
+# answers have none, which one scan over the whole text can rule out up front.
+_ITEM_LINE = rf"[^\S\n]*[^{_BULLET_CHARS},\s][^,\n]*"
+_RUN_CANDIDATE_RE = re.compile(rf"^(?:{_ITEM_LINE}\n){{{_MIN_RUN - 1}}}{_ITEM_LINE}$", re.MULTILINE)
 
 
 def _collapse_skill_lines(text: str) -> str:
     """Merge runs of one-item-per-line (e.g. skills) into comma-separated lines."""
-    lines = text.split("\n")
+    if not _RUN_CANDIDATE_RE.search(text):
+        return text
+    is_header = _HEADER_RE.fullmatch
+    is_item = _ITEM_RE.fullmatch
     out: list[str] = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    # Single forward pass; a non-empty run means we're inside a candidate skill list.
+    run: list[str] = []
+    run_items: list[str] = []
+    for line in text.split("\n"):
         stripped = line.strip()
+        if run:
+            if len(stripped) <= _ITEM_MAX and is_item(stripped):
+                run.append(line)
+                run_items.append(stripped)
+                continue
+            if len(run) >= _MIN_RUN:
+                out.append(", ".join(run_items))
+            else:
+                out.extend(run)
+            run.clear()
+            run_items.clear()
         # Section header (e.g. "Technical Skills", "Frontend"): keep as own line, don't merge
-        if stripped and " " in stripped and len(stripped) < 45 and not stripped.startswith(("-", "*", "#")):
+        if len(stripped) < _HEADER_MAX and is_header(stripped):
             out.append(line)
-            i += 1
-            continue
         # Short line, no comma, not a bullet/header: might be start of a skill list
-        looks_like_single_item = (
-            stripped
-            and not stripped.startswith("-")
-            and not stripped.startswith("*")
-            and not stripped.startswith("#")
-            and "," not in stripped
-            and len(stripped) < 55
-        )
-        if looks_like_single_item:
-            run = [stripped]
-            j = i + 1
-            while j < len(lines):
-                next_ln = lines[j].strip()
-                if not next_ln or next_ln.startswith("#") or next_ln.startswith("-") or next_ln.startswith("*"):
-                    break
-                if "," in next_ln or len(next_ln) > 55:
-                    break
-                run.append(next_ln)
-                j += 1
-            if len(run) >= 3:
-                out.append(", ".join(run))
-                i = j
-                continue
-        out.append(line)
-        i += 1
+        elif len(stripped) < _ITEM_MAX and is_item(stripped):
+            run.append(line)
+            run_items.append(stripped)
+        else:
+            out.append(line)
+    if len(run) >= _MIN_RUN:
+        out.append(", ".join(run_items))
+    else:
+        out.extend(run)
     return "\n".join(out)
 
 
-def answer_question(question: str, data: dict, history: list[dict] | None = None) -> str:
-    """Answer a question about the CV using Groq. Optional history for follow-up questions."""
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key or not api_key.strip():
-        raise ValueError("GROQ_API_KEY is not set. Add it to backend/.env")
+# Contact lookups answered straight from the CV, without an LLM call. A question is
+# routed only if every word is either one field keyword or filler, so "what's his
+# email?" is answered locally but "what projects are on his GitHub?" is not.
+_FAQ_ROUTES: list[tuple[re.Pattern[str], str, str, str]] = [
+    (re.compile(r"e-?mail"), "Email", "contact", "email"),
+    (re.compile(r"phone"), "Phone", "contact", "phone"),
+    (re.compile(r"github"), "GitHub", "links", "github"),
+    (re.compile(r"linkedin"), "LinkedIn", "links", "linkedin"),
+]
+_FAQ_FILLER = frozenset(
+    "what what's whats is are his her mayar mayar's the a an address number link url "
+    "profile account page can i get give me share send please".split()
+)
+_FAQ_WORD_RE = re.compile(r"[a-z0-9'-]+")
+
+
+def _faq_answer(question: str, data: dict) -> str | None:
+    """Answer a bare contact question (email, phone, GitHub, LinkedIn) from data, if possible."""
+    keywords = [w for w in _FAQ_WORD_RE.findall(question.lower()) if w not in _FAQ_FILLER]
+    if len(keywords) != 1:
+        return None
+    profile = data.get("profile") or {}
+    for pattern, label, group, field in _FAQ_ROUTES:
+        if pattern.fullmatch(keywords[0]):
+            value = (profile.get(group) or {}).get(field)
+            return f"**{label}:** {value}" if value else None
+    return None
+
+
+# Output-token caps by question type, since decode time grows with every generated
+# token. A lower cap applies only when every non-filler word of the question is a
+# keyword of a capped type; anything open-ended gets _DEFAULT_MAX_TOKENS. Bare contact
+# questions never get here, _faq_answer handles them.
+_TOKEN_BUDGETS: list[tuple[re.Pattern[str], int]] = [
+    (re.compile(r"skills?|stack|tech|technolog(?:y|ies)|education|degree|stud(?:y|ied)|university"), 384),
+    (re.compile(r"experience|work(?:ed)?|jobs?|roles?|projects?|built|background"), 768),
+]
+_BUDGET_FILLER = _FAQ_FILLER | frozenset(
+    "tell about describe list which where did does do he has have and of in on at".split()
+)
+_DEFAULT_MAX_TOKENS = 1024
+# Appended when the model hits max_tokens, so a cut-off answer isn't passed off as complete.
+_TRUNCATED_NOTE = "\n\n_(Answer cut short. Ask a narrower follow-up for the rest.)_"
+
+
+def _budget(question: str) -> int:
+    """max_tokens for a question, based on the kind of answer it calls for."""
+    caps = set()
+    for word in _FAQ_WORD_RE.findall(question.lower()):
+        if word in _BUDGET_FILLER:
+            continue
+        cap = next((cap for pattern, cap in _TOKEN_BUDGETS if pattern.fullmatch(word)), None)
+        if cap is None:
+            return _DEFAULT_MAX_TOKENS
+        caps.add(cap)
+    return max(caps, default=_DEFAULT_MAX_TOKENS)
+
+
+_CLIENT: Groq | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> Groq:
+    """Return the shared Groq client, creating it on first use so its connection pool is reused."""
+    global _CLIENT
+    if _CLIENT is None:
+        # Read here rather than at import, so main.py's load_dotenv(backend/.env) has run.
+        api_key = (os.environ.get("GROQ_API_KEY") or "").strip()
+        if not api_key:
+            raise ValueError("GROQ_API_KEY is not set. Add it to backend/.env")
+        # Streaming requests run in a threadpool; make sure only one client gets built.
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = Groq(api_key=api_key)
+    return _CLIENT
+
+
+def _collapse_stream(deltas: Iterable[str]) -> Iterator[str]:
+    """Apply _collapse_skill_lines to streamed text, stripped like a full response.
+
+    Complete lines are buffered until one arrives that cannot belong to a skill run
+    (see _ITEM_RE); everything up to it is collapsed and flushed, since no run spans
+    such a line. Trailing whitespace is held back until more text follows it.
+    """
+    block: list[str] = []
+    pending = ""
+    held = ""
+    started = False
+
+    def flush(final: bool) -> Iterator[str]:
+        nonlocal held, started
+        out = "\n".join(block)
+        # Most blocks are a single prose line; only _MIN_RUN or more lines can hold a run.
+        if len(block) >= _MIN_RUN:
+            out = _collapse_skill_lines(out)
+        block.clear()
+        if not started:
+            out = out.lstrip()
+        body = out.rstrip()
+        if body:
+            yield held + body
+            held = out[len(body):]
+            started = True
+        elif started:
+            held += out
+        if started and not final:
+            held += "\n"
+
+    for delta in deltas:
+        pending += delta
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            block.append(line)
+            stripped = line.strip()
+            if len(stripped) > _ITEM_MAX or not _ITEM_RE.fullmatch(stripped):
+                yield from flush(final=False)
+    block.append(pending)
+    yield from flush(final=True)
+
+
+# Messages of recent conversation sent with each question (last 3 exchanges).
+HISTORY_LIMIT = 6
+
+
+def _history_key(history: Sequence[dict] | None) -> tuple[tuple[str, str], ...]:
+    """(role, content) pairs for the last HISTORY_LIMIT messages."""
+    if not history:
+        return ()
+    return tuple(
+        ((msg.get("role") or "user").lower(), (msg.get("content") or "").strip()) for msg in history[-HISTORY_LIMIT:]
+    )
+
+
+def _render_history(key: tuple[tuple[str, str], ...]) -> str:
+    """Render the "Recent conversation" block for a _history_key() result."""
+    # Consecutive duplicate messages (e.g. a re-sent question) are only sent once.
+    hist = "\n".join(
+        f"{'Assistant' if role == 'assistant' else 'User'}: {content}"
+        for (role, content), _ in groupby(msg for msg in key if msg[1])
+    )
+    return f"Recent conversation:\n{hist}\n\n" if hist else ""
+
+
+def stream_answer(question: str, data: dict, history: Sequence[dict] | None = None) -> Iterator[str]:
+    """Stream the answer to a question about the CV as text chunks.
+
+    Configuration errors raise ValueError here, before the first chunk is produced.
+    """
+    faq = _faq_answer(question, data)
+    if faq is not None:
+        return iter((faq,))
 
-    context = build_context(data)
+    client = _get_client()
+    return _stream_completion(client, question, build_context(data), history)
+
+
+def _stream_completion(client: Groq, question: str, context: str, history: Sequence[dict] | None) -> Iterator[str]:
+    """Start the Groq completion for a question against an already built context."""
     if not context:
-        return "No CV data available to answer from."
-
-    client = Groq(api_key=api_key)
-    parts = [f"CV context:\n{context}", "\n"]
-    if history:
-        parts.append("Recent conversation:\n")
-        for msg in history[-6:]:  # last 3 exchanges max
-            role = (msg.get("role") or "user").lower()
-            content = (msg.get("content") or "").strip()
-            if content:
-                label = "Assistant" if role == "assistant" else "User"
-                parts.append(f"{label}: {content}\n")
-        parts.append("\n")
-    parts.append(f"Current question: {question.strip()}")
-
-    user_content = "".join(parts)
+        return iter(("No CV data available to answer from.",))
+
+    # The system prompt and CV context come first, as separate messages that are
+    # byte-identical for a given CV revision, so the provider can reuse the cached
+    # prefix. Only the trailing message varies per request.
+    user_content = f"{_render_history(_history_key(history))}Current question: {question.strip()}"
 
     response = client.chat.completions.create(
         model="llama-3.1-8b-instant",
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"CV context:\n{context}"},
             {"role": "user", "content": user_content},
         ],
-        max_tokens=1024,
+        max_tokens=_budget(question),
         temperature=0.3,
+        stream=True,
     )
-    choice = response.choices[0] if response.choices else None
-    if not choice or not getattr(choice, "message", None):
+    return _collapse_stream(_stream_deltas(response))
+
+
+def _stream_deltas(response: Iterable[Any]) -> Iterator[str]:
+    """Yield the text deltas of a streamed completion.
+
+    Raises ValueError if no delta had any non-whitespace content. This is the only
+    empty-answer check; it fires before anything is yielded downstream.
+    """
+    empty = True
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            empty = empty and choice.delta.content.isspace()
+            yield choice.delta.content
+        if choice.finish_reason == "length":
+            yield _TRUNCATED_NOTE
+    if empty:
         raise ValueError("Empty response from Groq")
-    raw = (choice.message.content or "").strip()
-    return _collapse_skill_lines(raw)
+
+
+def _complete(client: Groq, question: str, context: str, history: Sequence[dict] | None) -> str:
+    return "".join(_stream_completion(client, question, context, history))
+
+
+def answer_question(question: str, data: dict, history: Sequence[dict] | None = None) -> str:
+    """Answer a question about the CV using Groq. Optional history for follow-up questions."""
+    return "".join(stream_answer(question, data, history=history))
+
+
+# Upstream calls in flight, keyed by everything that shapes the answer. The context
+# string is the same object across requests, so its hash is computed once.
+_INFLIGHT: dict[tuple, asyncio.Task[str]] = {}
+
+
+def _finish_inflight(key: tuple, task: asyncio.Task[str]) -> None:
+    _INFLIGHT.pop(key, None)
+    # Mark a failure as retrieved, in case every awaiting caller was cancelled.
+    if not task.cancelled():
+        task.exception()
+
+
+async def answer_question_async(question: str, data: dict, history: Sequence[dict] | None = None) -> str:
+    """Async answer_question; concurrent identical requests share a single Groq call."""
+    faq = _faq_answer(question, data)
+    if faq is not None:
+        return faq
+
+    if _CLIENT is None:
+        # Cold start: building the client loads the SSL context, so it runs off the event
+        # loop, overlapped with the first context render. Afterwards both are cheap hits.
+        client, context = await asyncio.gather(asyncio.to_thread(_get_client), asyncio.to_thread(build_context, data))
+    else:
+        client, context = _CLIENT, build_context(data)
+    key = (context, question.strip(), _history_key(history))
+
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(_complete, client, question, context, history))
+        _INFLIGHT[key] = task
+        task.add_done_callback(partial(_finish_inflight, key))
+    # Shielded so one caller disconnecting doesn't cancel the call for the others.
+    return await asyncio.shield(task)
@@ -1,9 +1,21 @@
 import json
 import os
 
+# (mtime_ns, parsed data) of the last read of db_store.json.
+_cache = None
+
 
 def load_data():
+    """Return the parsed CV data, re-reading db_store.json only after it changes.
+
+    The same dict is returned until then (build_context memoizes on it), so callers
+    must not mutate it.
+    """
+    global _cache
     base = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(base, "db_store.json")
-    with open(path, "r") as f:
-        return json.load(f)
+    mtime = os.stat(path).st_mtime_ns
+    if _cache is None or _cache[0] != mtime:
+        with open(path, "r") as f:
+            _cache = (mtime, json.load(f))
+    return _cache[1]
@@ -1,10 +1,13 @@
+import asyncio
 import os
+from itertools import chain
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
-from ask_service import answer_question
+from ask_service import answer_question_async, stream_answer
 from load_data import load_data
 
 _load_env = os.path.join(os.path.dirname(__file__), ".env")
@@ -45,15 +48,31 @@ def get_cv():
 
 @app.post("/api/ask")
 @app.post("/ask")
-def ask_ai(question: str = Body(..., embed=True), history: list[dict] | None = Body(None, embed=True)):
+async def ask_ai(question: str = Body(..., embed=True), history: list[dict] | None = Body(None, embed=True)):
     if not question or not question.strip():
         return {"answer": "Please provide a question."}
     try:
-        data = load_data()
-        answer = answer_question(question.strip(), data, history=history)
+        data = await asyncio.to_thread(load_data)
+        answer = await answer_question_async(question.strip(), data, history=history)
         return {"answer": answer}
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/api/ask/stream")
+@app.post("/ask/stream")
+def ask_ai_stream(question: str = Body(..., embed=True), history: list[dict] | None = Body(None, embed=True)):
+    """Stream the answer as plain text chunks while the model is still generating."""
+    if not question or not question.strip():
+        return StreamingResponse(iter(("Please provide a question.",)), media_type="text/plain; charset=utf-8")
+    try:
+        data = load_data()
+        chunks = stream_answer(question.strip(), data, history=history)
+        # Pull the first chunk before sending headers, so an empty answer is still a 500.
+        first = next(chunks, "")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(chain((first,), chunks), media_type="text/plain; charset=utf-8")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file